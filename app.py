@@ -1,17 +1,93 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import networkx as nx
 import plotly.graph_objs as go
 
 # ---------- SETTINGS ----------
 CSV_PATH = "data/znfs_genes_correlation_forNetwork.csv"  # Update as needed
+KK_MAX_NODES = 500  # above this, skip kamada_kawai for a force-directed layout
+LAYOUT_GAP = 0.5  # spacing between packed graph components
 # ------------------------------
 
 st.set_page_config(layout="wide")
 st.title("Gene Regulatory Network")
 
+@st.cache_data(ttl=None, max_entries=4)
+def load_data(path):
+    df = pd.read_csv(path, index_col=0, engine="pyarrow", dtype_backend="pyarrow")
+    # categorical dtypes make the filter masks below cheaper
+    for col in ["KRAB-ZNF", "Gene", "exp"]:
+        df[col] = df[col].astype("category")
+    return df
+
+def layout_component(G_sub):
+    if G_sub.number_of_nodes() == 1:
+        return {node: np.zeros(2) for node in G_sub}
+    # kamada_kawai is O(V^3) (all-pairs shortest paths), so large components use
+    # a force-directed layout instead (compute_layout rescales every component)
+    if G_sub.number_of_nodes() > KK_MAX_NODES:
+        if hasattr(nx, "forceatlas2_layout"):
+            return nx.forceatlas2_layout(G_sub, max_iter=50, weight="weight", seed=42)
+        return nx.spring_layout(G_sub, iterations=50, seed=42)
+    # Use kamada_kawai_layout for clearer layout (fallback to spring_layout if needed)
+    try:
+        return nx.kamada_kawai_layout(G_sub)
+    except:
+        return nx.spring_layout(G_sub, seed=42)
+
+@st.cache_data(max_entries=32)
+def compute_layout(edges):
+    G_layout = nx.Graph()
+    G_layout.add_weighted_edges_from(edges)
+    # Lay out each connected component on its own and pack them into rows,
+    # largest first, instead of solving one joint distance matrix. Components
+    # are scaled by sqrt(size) so their widths reflect node counts.
+    components = sorted(nx.connected_components(G_layout), key=len, reverse=True)
+    layouts = []
+    for nodes in components:
+        p = layout_component(G_layout.subgraph(nodes))
+        p = nx.rescale_layout_dict(p, scale=np.sqrt(len(p)))
+        coords = np.array(list(p.values()))
+        layouts.append((p, coords.min(axis=0), np.ptp(coords, axis=0)))
+
+    # wrap rows at roughly the side of a square holding every component
+    row_width = np.sqrt(sum((w + LAYOUT_GAP) * (h + LAYOUT_GAP) for _, _, (w, h) in layouts))
+    pos = {}
+    offset_x, offset_y, row_height = 0.0, 0.0, 0.0
+    for p, (min_x, min_y), (w, h) in layouts:
+        if offset_x > 0 and offset_x + w > row_width:
+            offset_x, offset_y, row_height = 0.0, offset_y - row_height - LAYOUT_GAP, 0.0
+        shift = np.array([offset_x - min_x, offset_y - h - min_y])
+        for node, xy in p.items():
+            pos[node] = xy + shift
+        offset_x += w + LAYOUT_GAP
+        row_height = max(row_height, h)
+    return pos
+
+@st.cache_resource
+def build_full_graph(df):
+    # Build main graph with signed weights
+    genes = df['KRAB-ZNF'].to_numpy()
+    tes = df['Gene'].to_numpy()
+    coefs = df['coef'].to_numpy()
+    abs_coefs = np.abs(coefs)
+    exps = df['exp'].to_numpy()
+
+    G = nx.Graph()
+    G.add_nodes_from((gene, {'type': 'gene'}) for gene in np.unique(genes))
+    G.add_nodes_from((te, {'type': 'te', 'exp': exp}) for te, exp in zip(tes, exps))
+    G.add_weighted_edges_from(zip(genes, tes, coefs))
+
+    # Layout uses positive weights passed at construction time and is cached on
+    # the sorted edge set. The display graph keeps signed weights for edge coloring.
+    layout_edges = tuple(sorted(
+        (*sorted((u, v)), w) for u, v, w in zip(genes, tes, abs_coefs.tolist())
+    ))
+    return G, compute_layout(layout_edges)
+
 # Load CSV
-df = pd.read_csv(CSV_PATH, index_col=0)
+df = load_data(CSV_PATH)
 
 # Sidebar filters on landing page
 st.markdown("### Filters")
@@ -23,60 +99,59 @@ with col1:
 with col2:
     exp_filter = st.selectbox("Expression type", ["both", "up-regulated", "down-regulated"], index=0)
 
-# Apply filters
+# Apply filters as a row mask over the full table
+mask = np.ones(len(df), dtype=bool)
 if coef_direction == "positive":
-    df = df[df["coef"] > 0]
+    mask &= df["coef"].to_numpy() > 0
 elif coef_direction == "negative":
-    df = df[df["coef"] < 0]
+    mask &= df["coef"].to_numpy() < 0
 
 if exp_filter != "both":
-    df = df[df["exp"] == exp_filter]
-
-# Build main graph with signed weights
-G = nx.Graph()
-
-for _, row in df.iterrows():
-    gene = row['KRAB-ZNF']
-    te = row['Gene']
-    coef = row['coef']
-    exp = row['exp']
+    mask &= (df["exp"] == exp_filter).to_numpy()
 
-    G.add_node(gene, type='gene')
-    G.add_node(te, type='te', exp=exp)
-    G.add_edge(gene, te, weight=coef)
+# Plot the filtered edges as a view of the cached full graph, reusing its
+# positions so filter changes never rebuild the graph or re-solve the layout
+G_full, pos = build_full_graph(df)
+df = df[mask]
+genes = df['KRAB-ZNF'].to_numpy()
+tes = df['Gene'].to_numpy()
+G = G_full.edge_subgraph(zip(genes, tes))
 
-# Build a separate graph with positive weights for layout
-G_pos_weight = nx.Graph()
-for u, v, d in G.edges(data=True):
-    G_pos_weight.add_edge(u, v, weight=abs(d['weight']))
-
-# Use kamada_kawai_layout for clearer layout (fallback to spring_layout if needed)
-try:
-    pos = nx.kamada_kawai_layout(G_pos_weight)
-except:
-    pos = nx.spring_layout(G_pos_weight, seed=42)
+# Edge weights and expression come from the filtered rows, not the full graph,
+# so a repeated pair always shows the coef that passed the filter
+filtered_weights = dict(zip(zip(genes, tes), df['coef'].to_numpy()))
+filtered_exp = dict(zip(tes, df['exp'].to_numpy()))
 
 # custom colors
 custom_red = '#C41E3A'
 custom_blue = "#5073F8"
 
-# Edges
-edge_trace = []
-for u, v, d in G.edges(data=True):
-    color = custom_red if d['weight'] > 0 else custom_blue # set color
-    x0, y0 = pos[u]
-    x1, y1 = pos[v]
-    edge_trace.append(
-        go.Scatter(
-            x=[x0, x1, None], y=[y0, y1, None],
-            mode='lines',
-            line=dict(width=2, color=color),
-            hoverinfo='text',
-            text=f'{u} ↔ {v}<br>coef={d["weight"]:.2f}',
-            showlegend=False
-        )
+# Edges: one NaN-separated line trace per sign instead of one trace per edge
+def make_edge_trace(edges, color):
+    n = len(edges)
+    x, y = np.empty(3 * n), np.empty(3 * n)
+    text = [None] * (3 * n)
+    for i, (u, v, w) in enumerate(edges):
+        x[3 * i], y[3 * i] = pos[u]
+        x[3 * i + 1], y[3 * i + 1] = pos[v]
+        text[3 * i] = text[3 * i + 1] = f'{u} ↔ {v}<br>coef={w:.2f}'
+    x[2::3] = np.nan
+    y[2::3] = np.nan
+    return go.Scattergl(
+        x=x, y=y,
+        mode='lines',
+        line=dict(width=2, color=color),
+        hoverinfo='text',
+        text=text,
+        showlegend=False
     )
 
+signed_edges = [(u, v, w) for (u, v), w in filtered_weights.items()]
+edge_trace = [
+    make_edge_trace([e for e in signed_edges if e[2] > 0], custom_red),
+    make_edge_trace([e for e in signed_edges if e[2] <= 0], custom_blue),
+]
+
 # Nodes
 node_x, node_y, node_text = [], [], []
 node_color, node_border_color = [], []
@@ -92,10 +167,10 @@ for node in G.nodes():
         node_border_color.append('black')
     else:
         node_color.append('lightgreen')
-        exp = G.nodes[node].get('exp', 'up')
+        exp = filtered_exp.get(node, 'up')
         node_border_color.append(custom_red if exp == 'up-regulated' else custom_blue)
 
-node_trace = go.Scatter(
+node_trace = go.Scattergl(
     x=node_x,
     y=node_y,
     mode='markers+text',
@@ -133,7 +208,8 @@ fig.update_layout(
         showgrid=False,
         zeroline=False,
         showticklabels=False,
-        visible=False
+        visible=False,
+        scaleanchor="x"  # keep component layouts undistorted
     )
 )
 
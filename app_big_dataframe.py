@@ -1,35 +1,58 @@
 import streamlit as st
 import pandas as pd
+import polars as pl
 from utils.sidebar_filters import sidebar_filters, filter_dataframe
 from utils.swarmplot import plot_swarmplot 
 
 @st.cache_data
 def load_data():
-    df = pd.read_csv("data/df_dashboard.csv", index_col=0)
-    df["PVALUE"] = df["PVALUE"].apply(lambda x: f"{x:.2e}")
+    df = pd.read_csv("data/df_dashboard.csv", index_col=0, engine="pyarrow", dtype_backend="pyarrow")
+    # low-cardinality columns as categoricals: filter options come from .cat.categories
+    for col in ["CHROM", "MOTIF", "TE", "FAMILY", "CLASS", "SPECIES", "GENE"]:
+        df[col] = df[col].astype("category")
     return df
 
+# Polars copy of the table for the filter path; converted once and shared
+# across reruns and sessions (Polars frames are immutable)
+@st.cache_resource
+def load_polars_data():
+    return pl.from_pandas(load_data())
+
 df = load_data()
+pl_df = load_polars_data()
 
 st.title("KRAB-ZNF-related Motifs Features")
 
 filters = sidebar_filters(df)
 
-# Initialize session state variable to hold filtered dataframe or a flag
+# Initialize session state variables to hold the filtered dataframe and a flag;
+# load_data returns a fresh copy each rerun, so object identity can't be used
 if "filtered_df" not in st.session_state:
     st.session_state.filtered_df = df
-
-if filters["apply"]:
-    st.session_state.filtered_df = filter_dataframe(df, filters)
-
-filtered_df = st.session_state.filtered_df
-if filtered_df is df:
-    st.write(f"### Total Results: {len(df)} rows")
-else:
-    st.write(f"### Filtered Results: {len(filtered_df)} rows")
-
-st.dataframe(filtered_df.reset_index(drop=True))
-
-# plot swarmplot
-fig = plot_swarmplot(filtered_df)
-st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    st.session_state.is_filtered = False
+
+# Apply button and results rerun as a fragment: applying filters redraws only
+# this block. Sidebar selections trigger a full run, so `filters` is current.
+@st.fragment
+def show_results(df, pl_df, filters):
+    if st.button("Apply Filters"):
+        st.session_state.filtered_df = filter_dataframe(df, pl_df, filters)
+        st.session_state.is_filtered = st.session_state.filtered_df is not df
+
+    filtered_df = st.session_state.filtered_df
+    if not st.session_state.is_filtered:
+        st.write(f"### Total Results: {len(df)} rows")
+    else:
+        st.write(f"### Filtered Results: {len(filtered_df)} rows")
+
+    # PVALUE stays numeric (sortable); scientific notation is applied at display time
+    st.dataframe(
+        filtered_df.reset_index(drop=True),
+        column_config={"PVALUE": st.column_config.NumberColumn(format="%.2e")}
+    )
+
+    # plot swarmplot
+    fig = plot_swarmplot(filtered_df)
+    st.plotly_chart(fig, use_container_width=True)
+
+show_results(df, pl_df, filters)
@@ -4,6 +4,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from pathlib import Path
+from functools import lru_cache
 import re
 
 # Configure page
@@ -85,53 +86,71 @@ def load_csv_data(file_path=None, uploaded_file=None):
                 df[col] = ''
         
         # Clean and convert data types
-        df['start'] = pd.to_numeric(df['start'], errors='coerce').fillna(0).astype(int)
-        df['end'] = pd.to_numeric(df['end'], errors='coerce').fillna(0).astype(int)
-        df['pvalue'] = pd.to_numeric(df['pvalue'], errors='coerce').fillna(0)
-        df['length'] = pd.to_numeric(df['length'], errors='coerce').fillna(0).astype(int)
+        # Downcast: genomic coordinates fit int32, motif lengths int16
+        df['start'] = pd.to_numeric(df['start'], errors='coerce').fillna(0).astype(np.int32)
+        df['end'] = pd.to_numeric(df['end'], errors='coerce').fillna(0).astype(np.int32)
+        df['pvalue'] = pd.to_numeric(df['pvalue'], errors='coerce').fillna(0).astype(np.float32)
+        df['length'] = pd.to_numeric(df['length'], errors='coerce').fillna(0).astype(np.int16)
         
         # Remove rows with missing essential data
         df = df[(df['chr'] != '') & (df['start'] > 0) & (df['end'] > 0)]
         
+        # Categorical filter columns so equality masks compare integer codes
+        for col in ['chr', 'motif', 'strand', 'class', 'tefamily', 'gene', 'species']:
+            df[col] = df[col].astype('category')
+        
         return df
         
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
+# Sort rank for the fixed chromosome universe (chr1..chr22, chrX, chrY, chrM)
+_CHR_RANK = {f'chr{i}': (0, i) for i in range(1, 23)} | {
+    'chrX': (1, 'X'),
+    'chrY': (1, 'Y'),
+    'chrM': (1, 'M')
+}
+
+@lru_cache(maxsize=None)
+def _chr_sort_key(chr_name):
+    """Regex sort key for names outside _CHR_RANK (e.g. chr2A, chr23)"""
+    match = re.match(r'chr(\d+|[XYM])', chr_name)
+    if match:
+        value = match.group(1)
+        if value.isdigit():
+            return (0, int(value))
+        else:
+            return (1, value)
+    return (2, chr_name)
+
 def natural_sort_chromosomes(chromosomes):
     """Sort chromosomes in natural order (chr1, chr2, ..., chr10, ..., chrX, chrY)"""
-    def sort_key(chr_name):
-        match = re.match(r'chr(\d+|[XYM])', str(chr_name))
-        if match:
-            value = match.group(1)
-            if value.isdigit():
-                return (0, int(value))
-            else:
-                return (1, value)
-        return (2, str(chr_name))
-    
-    return sorted(chromosomes, key=sort_key)
+    return sorted(chromosomes, key=lambda c: _CHR_RANK.get(c) or _chr_sort_key(str(c)))
 
 def filter_data(df, filters):
     """Apply filters to the dataframe"""
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     
     for column, value in filters.items():
-        if value and column in filtered_df.columns:
-            if column in ['pvalue_max', 'length_min']:
-                continue  # Handle these separately
-            filtered_df = filtered_df[filtered_df[column] == value]
+        if column in ['pvalue_max', 'length_min'] or not value:
+            continue  # numeric filters handled below; empty selections don't filter
+        if column in df.columns:
+            mask &= (df[column] == value).to_numpy()
     
     # Handle numeric filters
     if filters.get('pvalue_max'):
-        filtered_df = filtered_df[filtered_df['pvalue'] <= filters['pvalue_max']]
+        mask &= df['pvalue'].to_numpy() <= filters['pvalue_max']
     
     if filters.get('length_min'):
-        filtered_df = filtered_df[filtered_df['length'] >= filters['length_min']]
+        mask &= df['length'].to_numpy() >= filters['length_min']
     
-    return filtered_df
+    return df[mask]
 
+@st.cache_data(
+    hash_funcs={pd.DataFrame: lambda d: int(pd.util.hash_pandas_object(d, index=True).sum())},
+    max_entries=16
+)
 def create_chromosome_chart(df):
     """Create chromosome distribution chart"""
     if df.empty:
@@ -141,10 +160,11 @@ def create_chromosome_chart(df):
     
     # Count hits per chromosome
     chr_counts = df['chr'].value_counts()
+    chr_counts = chr_counts[chr_counts > 0]  # categorical counts include unused chromosomes
     
     # Sort chromosomes naturally
     sorted_chromosomes = natural_sort_chromosomes(chr_counts.index)
-    counts = [chr_counts[chr] for chr in sorted_chromosomes]
+    counts = chr_counts.reindex(sorted_chromosomes).to_numpy()
     
     # Create bar chart
     fig = go.Figure(data=[
@@ -311,9 +331,8 @@ def main():
     if not filtered_df.empty:
         # Format the dataframe for display
         display_df = filtered_df.copy()
-        display_df['start'] = display_df['start'].apply(lambda x: f"{x:,}")
-        display_df['end'] = display_df['end'].apply(lambda x: f"{x:,}")
-        display_df['pvalue'] = display_df['pvalue'].apply(lambda x: f"{x:.2e}")
+        display_df['start'] = display_df['start'].map('{:,}'.format)
+        display_df['end'] = display_df['end'].map('{:,}'.format)
         
         # Rename columns for display
         display_df = display_df.rename(columns={
@@ -333,7 +352,8 @@ def main():
         st.dataframe(
             display_df,
             use_container_width=True,
-            height=400
+            height=400,
+            column_config={'P-VALUE': st.column_config.NumberColumn(format='%.2e')}
         )
         
         # Download button
@@ -1,63 +1,87 @@
 # sidebar_filters.py
+import operator
+from functools import reduce
+
 import streamlit as st
 import pandas as pd
+import polars as pl
+
+FILTER_KEYS = {
+    "chrom": "CHROM",
+    "motif": "MOTIF",
+    "te": "TE",
+    "family": "FAMILY",
+    "class": "CLASS",
+    "species": "SPECIES",
+    "gene": "GENE",
+}
+FILTER_COLUMNS = list(FILTER_KEYS.values())
+
+def _column_options(col):
+    # categories of a categorical column are already sorted and deduplicated
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.categories.tolist()
+    return sorted(col.dropna().unique())
+
+@st.cache_data
+def _filter_options(df_id, _df):
+    # all option lists in one cached pass, keyed on a cheap identity token
+    return {col: _column_options(_df[col]) for col in FILTER_COLUMNS}
 
 def sidebar_filters(df):
     st.sidebar.header("Filter Options")
+    options = _filter_options((df.shape, tuple(df.columns)), df)
 
     with st.sidebar.expander("CHROM", expanded=False):
         chrom_filter = st.multiselect(
             "Select CHROM",
-            options=sorted(df["CHROM"].dropna().unique()),
+            options=options["CHROM"],
             default=[]
         )
 
     with st.sidebar.expander("MOTIF", expanded=False):
         motif_filter = st.multiselect(
             "Select MOTIF",
-            options=sorted(df["MOTIF"].dropna().unique()),
+            options=options["MOTIF"],
             default=[]
         )
 
     with st.sidebar.expander("TE", expanded=False):
         te_filter = st.multiselect(
             "Select TE",
-            options=sorted(df["TE"].dropna().unique()),
+            options=options["TE"],
             default=[]
         )
 
     with st.sidebar.expander("Family ID", expanded=False):
         family_id_filter = st.multiselect(
             "Select Family ID",
-            options=sorted(df["FAMILY"].dropna().unique()),
+            options=options["FAMILY"],
             default=[]
         )
 
     with st.sidebar.expander("Class ID", expanded=False):
         class_id_filter = st.multiselect(
             "Select Class ID",
-            options=sorted(df["CLASS"].dropna().unique()),
+            options=options["CLASS"],
             default=[]
         )
 
     with st.sidebar.expander("Species", expanded=False):
         species_filter = st.multiselect(
             "Select Species",
-            options=sorted(df["SPECIES"].dropna().unique()),
+            options=options["SPECIES"],
             default=[]
         )
 
     with st.sidebar.expander("Gene", expanded=False):
         gene_filter = st.multiselect(
             "Select Genes",
-            options=sorted(df["GENE"].dropna().unique()),
+            options=options["GENE"],
             default=[]
         )
 
-    apply = st.sidebar.button("Apply Filters")
-
     return {
-        "apply": apply,
         "chrom": chrom_filter,
         "motif": motif_filter,
         "te": te_filter,
@@ -67,28 +91,11 @@ def sidebar_filters(df):
         "gene": gene_filter
     }
 
-def filter_dataframe(df, filters):
-    filtered_df = df.copy()
-    # Apply filters only if selections are made, otherwise don't filter
-    if filters["chrom"]:
-        filtered_df = filtered_df[filtered_df["CHROM"].isin(filters["chrom"])]
-
-    if filters["motif"]:
-        filtered_df = filtered_df[filtered_df["MOTIF"].isin(filters["motif"])]
-
-    if filters["te"]:
-        filtered_df = filtered_df[filtered_df["TE"].isin(filters["te"])]
-
-    if filters["family"]:
-        filtered_df = filtered_df[filtered_df["FAMILY"].isin(filters["family"])]
-
-    if filters["class"]:
-        filtered_df = filtered_df[filtered_df["CLASS"].isin(filters["class"])]
-
-    if filters["species"]:
-        filtered_df = filtered_df[filtered_df["SPECIES"].isin(filters["species"])]
-
-    if filters["gene"]:
-        filtered_df = filtered_df[filtered_df["GENE"].isin(filters["gene"])]
+def filter_dataframe(df, pl_df, filters):
+    # Fuse all active selections into one Polars predicate over pl_df (the
+    # cached Polars copy of df); empty selections don't filter
+    preds = [pl.col(col).is_in(filters[key]) for key, col in FILTER_KEYS.items() if filters[key]]
+    if not preds:
+        return df
 
-    return filtered_df
+    return pl_df.filter(reduce(operator.and_, preds)).to_pandas()
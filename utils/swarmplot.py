@@ -1,26 +1,48 @@
+import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
 
+# cache_resource hands back the figure without pickling it; cache_data would
+# unpickle the full customdata array on every hit
+@st.cache_resource(
+    hash_funcs={pd.DataFrame: lambda d: int(pd.util.hash_pandas_object(d, index=True).sum())},
+    max_entries=4
+)
 def plot_swarmplot(df: pd.DataFrame) -> go.Figure:
-    df = df.copy()
-    df["midpoint"] = (df["START"] + df["END"]) / 2
+    # derived columns are computed as arrays so the input frame is never copied
+    midpoint = (df["START"].to_numpy() + df["END"].to_numpy()) * 0.5
 
     chrom_order = [f"chr{i}" for i in range(1, 23)] + ["chrX", "chrY"]
-    chrom_present = [c for c in chrom_order if c in df["CHROM"].unique()]
-    df["CHROM"] = pd.Categorical(df["CHROM"], categories=chrom_present, ordered=True)
+    present = set(df["CHROM"].unique())
+    chrom_present = [c for c in chrom_order if c in present]
+    chrom_codes = pd.Categorical(df["CHROM"], categories=chrom_present).codes
+    keep = chrom_codes >= 0
 
-    fig = px.strip(
-        df,
-        x="midpoint",
-        y="CHROM",
-        orientation="h",
-        hover_data=df.columns,
-        stripmode="overlay"
+    # jitter points around their chromosome row to avoid overlap; seeded so
+    # the same data always renders the same way
+    rng = np.random.default_rng(0)
+    y_jitter = chrom_codes[keep] + rng.uniform(-0.3, 0.3, keep.sum())
+
+    hover_lines = [f"{col}=%{{customdata[{i}]}}" for i, col in enumerate(df.columns)]
+    fig = go.Figure(
+        go.Scattergl(
+            x=midpoint[keep],
+            y=y_jitter,
+            mode="markers",
+            marker=dict(size=4, opacity=0.6),
+            customdata=df.to_numpy()[keep],
+            hovertemplate="midpoint=%{x}<br>" + "<br>".join(hover_lines) + "<extra></extra>"
+        )
     )
-    fig.update_traces(jitter=0.3)  # apply jitter to avoid overlap
     fig.update_layout(
         title="Distribution of Midpoints by Chromosome",
-        yaxis=dict(categoryorder="array", categoryarray=chrom_present)
+        xaxis=dict(title="midpoint"),
+        yaxis=dict(
+            title="CHROM",
+            tickmode="array",
+            tickvals=list(range(len(chrom_present))),
+            ticktext=chrom_present
+        )
     )
     return fig